@@ -1,321 +1,566 @@
 """MetaII assembly VM"""
 
 from __future__ import annotations
-import re
-from sys import argv
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_right
+from sys import argv, intern
 from string import whitespace
-from typing import Callable, Union
+from typing import Callable, Final, Union
+
+# Whitespace as a frozenset of byte values: set membership is a hash
+# probe, where the str form does a substring scan per character tested.
+_WS_SET: Final[frozenset[int]] = frozenset(whitespace.encode('ascii'))
 
 
 class MetaSyntax(Exception):
     """A META-II syntax error -- a VM halt."""
 
 
-@dataclass(eq=False)
 class VM:
-    """The Meta-II VM."""
-    program_counter: int
-    memory: list[tuple[Callable[[VM, tuple], None], tuple]]
-    switch: bool = field(default=False, init=False)
-    inbuf: str = field(default='')
-    outbuf: str = field(default='', init=False)
-    outline: str = field(default='', init=False)
-    outlabel: bool = field(default=False, init=False)
-    labels: dict[str, int] = field(default_factory=dict)
-    stack: list = field(default_factory=list, init=False)
-    inbuf_index: int = field(default=0)
-    deleted: str = field(default='', init=False)
-    templabel: int = field(default=0, init=False)
+    """The Meta-II VM.
+
+    Slotted by hand rather than a dataclass: every opcode closure reads
+    and writes these attributes, and slots make each access a fixed
+    offset load instead of an instance dict lookup.
+    """
+
+    __slots__ = ('program_counter', 'op_ids', 'op_args', 'switch',
+                 '_inbuf', 'inbuf_b', '_newlines', 'outbuf', 'outline',
+                 'outlabel', 'labels', 'stack', 'flagstack',
+                 'inbuf_index', 'deleted', 'templabel', 'label_names')
+
+    def __init__(self, program_counter: int) -> None:
+        self.program_counter = program_counter
+        self.op_ids = array('b')
+        self.op_args: list[Union[str, int, None]] = []
+        self._inbuf = ''
+        self.inbuf_b = b''
+        self._newlines = array('i')
+        self.labels: dict[str, int] = {}
+        self.inbuf_index = 0
+        self.reset()
 
     def reset(self) -> None:
         """Reset internal state."""
-        self.stack = []
-        self.outbuf = ''
+        self.stack = array('l')
+        self.flagstack = array('b')
+        self.outbuf: list[str] = []
         self.outlabel = False
-        self.outline = ''
+        self.outline: list[str] = []
         self.deleted = ''
         self.switch = False
         self.templabel = 0
+        self.label_names: list[str] = []
 
     @property
-    def input(self) -> str:
-        """Return out input buffer from the current index only."""
-        return self.inbuf[self.inbuf_index:]
-
-    def seek(self, i: int, relative: bool = True) -> None:
-        """Seek our input index."""
-        if relative:
-            i += self.inbuf_index
-        self.inbuf_index = max(0, i)
+    def inbuf(self) -> str:
+        """The input buffer."""
+        return self._inbuf
+
+    @inbuf.setter
+    def inbuf(self, value: str) -> None:
+        # Keep a UTF-8 mirror: all scanning runs over it, so indexing
+        # yields small ints instead of one-character strings, and
+        # inbuf_index counts bytes. Also record every newline offset up
+        # front so linenum is a binary search instead of a rescan of
+        # everything consumed so far.
+        encoded = value.encode('utf-8')
+        newlines = array('i')
+        pos = encoded.find(b'\n')
+        while pos >= 0:
+            newlines.append(pos)
+            pos = encoded.find(b'\n', pos + 1)
+        self._inbuf = value
+        self.inbuf_b = encoded
+        self._newlines = newlines
 
     def skip_ws(self) -> None:
         """Skip leading whitespace."""
-        while len(self.input) > 0 and self.input[0] in whitespace:
-            self.seek(1)
+        buf = self.inbuf_b
+        i = self.inbuf_index
+        n = len(buf)
+        ws = _WS_SET
+        while i < n and buf[i] in ws:
+            i += 1
+        self.inbuf_index = i
 
     def delete(self, chars: int) -> None:
         """Delete up to chars characters from our input string, storing them
         in self.deleted.
         """
-        self.deleted = self.input[:chars]
-        self.seek(chars)
+        i = self.inbuf_index
+        self.deleted = self.inbuf_b[i:i + chars].decode('utf-8')
+        self.inbuf_index = i + chars
+
+    @property
+    def output(self) -> str:
+        """Return the joined output buffer."""
+        return ''.join(self.outbuf)
 
     @property
     def linenum(self) -> int:
         """Return the current input line number."""
-        return self.inbuf[:self.inbuf_index].count('\n') + 1
-
-    def resolve(self, elem: Union[str, int]) -> int:
-        """Resolve a target to either an already-numeric address, or an
-        internal label name's address.
-        """
-        if isinstance(elem, str):
-            return self.labels[elem]
-        return elem
-
-
-def newop(opcodes: dict[str, Callable[[VM, tuple], None]], name: str):
-    """Decorator to build an opcode."""
-    def inner(func: Callable):
-        opcodes[name] = func
-    return inner
-
-
-metaops = {}  # type:dict[str, Callable[[VM, tuple], None]]
-
-
-@newop(metaops, 'tst')
-def op_tst(meta_vm: VM, args) -> None:
-    """Skipping leading whitespace, if the input buffer matches the arg
-    string, set the switch and skip it in the input. Else, reset the switch.
-    """
-    meta_vm.skip_ws()
-    if meta_vm.input.startswith(args[0]):
-        meta_vm.delete(len(args[0]))
-        meta_vm.switch = True
-    else:
-        meta_vm.switch = False
-
-
-@newop(metaops, 'id')
-def op_id(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """After skipping leading whitespace, if we see an identifier, delete it
-    and set the switch. Else, reset the switch.
-    """
-    meta_vm.skip_ws()
-    match = re.match(r'[a-zA-Z][a-zA-Z0-9]*', meta_vm.input)
-    if match is not None:
-        meta_vm.delete(len(match[0]))
-        meta_vm.switch = True
-    else:
-        meta_vm.switch = False
-
-
-@newop(metaops, 'num')
-def op_num(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Skipping leading whitespace, if the input buffer starts with a number,
-    set the switch and delete it. Else, reset the switch.
-    """
-    meta_vm.skip_ws()
-    match = re.match(r'[0-9]+(\.[0-9]+)*', meta_vm.input)
-    if match is not None:
-        meta_vm.delete(len(match[0]))
-        meta_vm.switch = True
-    else:
-        meta_vm.switch = False
-
-
-@newop(metaops, 'sr')
-def op_sr(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Skipping leading whitespace, if we see a string, delete it and set the
-    switch. Else, reset the switch.
-    """
-    meta_vm.skip_ws()
-    match = re.match(r"'[^']+'", meta_vm.input)
-    if match is not None:
-        meta_vm.delete(len(match[0]))
-        meta_vm.switch = True
-    else:
-        meta_vm.switch = False
-
-
-@newop(metaops, 'cll')
-def op_cll(meta_vm: VM, args) -> None:
-    """Call the given label."""
-    if len(meta_vm.stack) >= 2 and meta_vm.stack[-2:] == [0, 0]:
-        meta_vm.stack.append(0)
-        flag = -1
-    else:
-        meta_vm.stack += [0, 0, 0]
-        flag = 1
-    meta_vm.stack[-3] = meta_vm.program_counter * flag
-    meta_vm.program_counter = meta_vm.resolve(args[0])
-
-
-@newop(metaops, 'r')
-def op_r(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Execute a return."""
-    retaddr = meta_vm.stack[-3]
-    if retaddr < 0:
-        retaddr = -retaddr
-        meta_vm.stack.pop()
-        meta_vm.stack[-2:] = [0, 0]
-    else:
-        del meta_vm.stack[-3:]
-    meta_vm.program_counter = retaddr
-
-
-@newop(metaops, 'set')
-def op_set(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Set the branch switch."""
-    meta_vm.switch = True
-
-
-@newop(metaops, 'b')
-def op_b(meta_vm: VM, args) -> None:
-    """Branch unconditionally."""
-    meta_vm.program_counter = meta_vm.resolve(args[0])
-
-
-@newop(metaops, 'bt')
-def op_bt(meta_vm: VM, args) -> None:
-    """Branch if switch set."""
-    if meta_vm.switch:
-        meta_vm.program_counter = meta_vm.resolve(args[0])
-
-
-@newop(metaops, 'bf')
-def op_bf(meta_vm: VM, args) -> None:
-    """Branch if switch reset."""
-    if not meta_vm.switch:
-        meta_vm.program_counter = meta_vm.resolve(args[0])
-
-
-@newop(metaops, 'be')
-def op_be(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """If the switch if reset halt."""
-    if not meta_vm.switch:
-        raise MetaSyntax
-
-
-@newop(metaops, 'cl')
-def op_cl(meta_vm: VM, args) -> None:
-    """Copy the inline arg to the output."""
-    meta_vm.outline += args[0]
-
-
-@newop(metaops, 'ci')
-def op_ci(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Copy the deleted text to the output."""
-    meta_vm.outline += meta_vm.deleted
-
-
-def op_gn(meta_vm: VM, offset: int) -> None:
-    """Generate the given temp label (offset 1 or 2) if needbe, and output
-    it.
-    """
-    label = meta_vm.stack[-offset]
-    if label == 0:
-        meta_vm.templabel += 1
-        label = meta_vm.templabel
-        meta_vm.stack[-offset] = label
-    meta_vm.outline += f"l{label}"
-
-
-@newop(metaops, 'gn1')
-def op_gn1(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Output/generate label 1."""
-    op_gn(meta_vm, 1)
-
-
-@newop(metaops, 'gn2')
-def op_gn2(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Output/generate label 2."""
-    op_gn(meta_vm, 2)
-
-
-@newop(metaops, 'lb')
-def op_lb(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Set the flag so that the current line will start with a label."""
-    meta_vm.outlabel = True
-
-
-@newop(metaops, 'out')
-def op_out(meta_vm: VM, args) -> None:  # pylint:disable=unused-argument
-    """Output the current line and reset outlabel."""
-    if not meta_vm.outlabel:
-        meta_vm.outbuf += '\t'
-    meta_vm.outbuf += meta_vm.outline + '\n'
-    meta_vm.outlabel = False
-    meta_vm.outline = ''
+        return bisect_right(self._newlines, self.inbuf_index - 1) + 1
+
+
+# Small integer opcode IDs.
+OP_TST: Final = 0
+OP_BF: Final = 1
+OP_BT: Final = 2
+OP_B: Final = 3
+OP_CLL: Final = 4
+OP_R: Final = 5
+OP_ID: Final = 6
+OP_NUM: Final = 7
+OP_SR: Final = 8
+OP_CL: Final = 9
+OP_CI: Final = 10
+OP_GN1: Final = 11
+OP_GN2: Final = 12
+OP_SET: Final = 13
+OP_LB: Final = 14
+OP_OUT: Final = 15
+OP_BE: Final = 16
+
+metaops: Final[dict[str, int]] = {
+    'tst': OP_TST,
+    'bf': OP_BF,
+    'bt': OP_BT,
+    'b': OP_B,
+    'cll': OP_CLL,
+    'r': OP_R,
+    'id': OP_ID,
+    'num': OP_NUM,
+    'sr': OP_SR,
+    'cl': OP_CL,
+    'ci': OP_CI,
+    'gn1': OP_GN1,
+    'gn2': OP_GN2,
+    'set': OP_SET,
+    'lb': OP_LB,
+    'out': OP_OUT,
+    'be': OP_BE,
+}
+
+
+def _scan_id(buf: bytes, i: int) -> int:
+    """Return the length of the identifier at buf[i:], or 0."""
+    n = len(buf)
+    j = i
+    if j < n and (0x61 <= buf[j] <= 0x7a or 0x41 <= buf[j] <= 0x5a):
+        j += 1
+        while j < n and (0x61 <= buf[j] <= 0x7a or 0x41 <= buf[j] <= 0x5a
+                         or 0x30 <= buf[j] <= 0x39):
+            j += 1
+    return j - i
+
+
+def _scan_num(buf: bytes, i: int) -> int:
+    """Return the length of the number at buf[i:], or 0."""
+    n = len(buf)
+    j = i
+    while j < n and 0x30 <= buf[j] <= 0x39:
+        j += 1
+    if j == i:
+        return 0
+    while j < n and buf[j] == 0x2e:
+        k = j + 1
+        while k < n and 0x30 <= buf[k] <= 0x39:
+            k += 1
+        if k == j + 1:
+            break
+        j = k
+    return j - i
+
+
+def _scan_sr(buf: bytes, i: int) -> int:
+    """Return the length of the quoted string at buf[i:], or 0."""
+    if i < len(buf) and buf[i] == 0x27:
+        j = buf.find(b"'", i + 1)
+        if j > i + 1:
+            return j - i + 1
+    return 0
+
+
+# Shorthands for the closure compiler below.
+_OpFn = Callable[[], int]
+_OpArg = Union[str, int, None]
+_OptInt = Union[int, None]
+
+
+def _compile_tst(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile tst, fused with a following conditional branch."""
+    lit = str(arg).encode('utf-8')
+    if on_hit is not None:
+        def fused_fn(lit=lit, size=len(lit), yes=on_hit, no=on_miss):
+            vm.skip_ws()
+            if vm.inbuf_b.startswith(lit, vm.inbuf_index):
+                vm.delete(size)
+                vm.switch = True
+                return yes
+            vm.switch = False
+            return no
+        return fused_fn
+
+    def op_fn(lit=lit, size=len(lit), nxt=nxt):
+        vm.skip_ws()
+        if vm.inbuf_b.startswith(lit, vm.inbuf_index):
+            vm.delete(size)
+            vm.switch = True
+        else:
+            vm.switch = False
+        return nxt
+    return op_fn
+
+
+def _compile_bf(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a branch-if-false."""  # pylint:disable=unused-argument
+    def op_fn(target=arg, nxt=nxt):
+        return nxt if vm.switch else target
+    return op_fn
+
+
+def _compile_bt(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a branch-if-true."""  # pylint:disable=unused-argument
+    def op_fn(target=arg, nxt=nxt):
+        return target if vm.switch else nxt
+    return op_fn
+
+
+def _compile_b(vm: VM, arg: _OpArg, nxt: int,
+               on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile an unconditional branch."""  # pylint:disable=unused-argument
+    def op_fn(target=arg):
+        return target
+    return op_fn
+
+
+def _compile_cll(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a call."""  # pylint:disable=unused-argument
+    def op_fn(target=arg, nxt=nxt):
+        stack = vm.stack
+        if len(stack) >= 2 and stack[-1] == 0 and stack[-2] == 0:
+            stack.append(0)
+            vm.flagstack.append(1)
+        else:
+            stack.append(0)
+            stack.append(0)
+            stack.append(0)
+            vm.flagstack.append(0)
+        stack[-3] = nxt
+        return target
+    return op_fn
+
+
+def _compile_r(vm: VM, arg: _OpArg, nxt: int,
+               on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a return."""  # pylint:disable=unused-argument
+    def op_fn():
+        stack = vm.stack
+        retaddr = stack[-3]
+        if vm.flagstack.pop():
+            stack.pop()
+            stack[-1] = 0
+            stack[-2] = 0
+        else:
+            del stack[-3:]
+        return retaddr
+    return op_fn
+
+
+def _compile_scan(vm: VM, scan: Callable[[bytes, int], int], nxt: int,
+                  on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a scanner opcode, fused with a following branch."""
+    if on_hit is not None:
+        def fused_fn(scan=scan, yes=on_hit, no=on_miss):
+            vm.skip_ws()
+            size = scan(vm.inbuf_b, vm.inbuf_index)
+            if size:
+                vm.delete(size)
+                vm.switch = True
+                return yes
+            vm.switch = False
+            return no
+        return fused_fn
+
+    def op_fn(scan=scan, nxt=nxt):
+        vm.skip_ws()
+        size = scan(vm.inbuf_b, vm.inbuf_index)
+        if size:
+            vm.delete(size)
+            vm.switch = True
+        else:
+            vm.switch = False
+        return nxt
+    return op_fn
+
+
+def _compile_id(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile an id scan."""  # pylint:disable=unused-argument
+    return _compile_scan(vm, _scan_id, nxt, on_hit, on_miss)
+
+
+def _compile_num(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a num scan."""  # pylint:disable=unused-argument
+    return _compile_scan(vm, _scan_num, nxt, on_hit, on_miss)
+
+
+def _compile_sr(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile an sr scan."""  # pylint:disable=unused-argument
+    return _compile_scan(vm, _scan_sr, nxt, on_hit, on_miss)
+
+
+def _compile_cl(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a copy-literal."""  # pylint:disable=unused-argument
+    def op_fn(lit=arg, nxt=nxt):
+        vm.outline.append(lit)
+        return nxt
+    return op_fn
+
+
+def _compile_ci(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a copy-input."""  # pylint:disable=unused-argument
+    def op_fn(nxt=nxt):
+        vm.outline.append(vm.deleted)
+        return nxt
+    return op_fn
+
+
+def _compile_gn(vm: VM, offset: int, nxt: int) -> _OpFn:
+    """Compile a generate-label of the given stack offset."""
+    def op_fn(offset=offset, nxt=nxt):
+        label = vm.stack[-offset]
+        if label == 0:
+            vm.templabel += 1
+            label = vm.templabel
+            vm.stack[-offset] = label
+        names = vm.label_names
+        while len(names) < label:
+            names.append(f"l{len(names) + 1}")
+        vm.outline.append(names[label - 1])
+        return nxt
+    return op_fn
+
+
+def _compile_gn1(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile gn1."""  # pylint:disable=unused-argument
+    return _compile_gn(vm, 1, nxt)
+
+
+def _compile_gn2(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile gn2."""  # pylint:disable=unused-argument
+    return _compile_gn(vm, 2, nxt)
+
+
+def _compile_set(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a set-switch."""  # pylint:disable=unused-argument
+    def op_fn(nxt=nxt):
+        vm.switch = True
+        return nxt
+    return op_fn
+
+
+def _compile_lb(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a label-line flag."""  # pylint:disable=unused-argument
+    def op_fn(nxt=nxt):
+        vm.outlabel = True
+        return nxt
+    return op_fn
+
+
+def _compile_out(vm: VM, arg: _OpArg, nxt: int,
+                 on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile an output-line."""  # pylint:disable=unused-argument
+    def op_fn(nxt=nxt):
+        if not vm.outlabel:
+            vm.outbuf.append('\t')
+        vm.outbuf.extend(vm.outline)
+        vm.outbuf.append('\n')
+        vm.outlabel = False
+        vm.outline.clear()
+        return nxt
+    return op_fn
+
+
+def _compile_be(vm: VM, arg: _OpArg, nxt: int,
+                on_hit: _OptInt, on_miss: _OptInt) -> _OpFn:
+    """Compile a branch-error halt."""  # pylint:disable=unused-argument
+    def op_fn(nxt=nxt):
+        if not vm.switch:
+            raise MetaSyntax
+        return nxt
+    return op_fn
+
+
+# Closure factories indexed by opcode ID: one C-level list index per
+# instruction compiled, in place of an if/elif walk over every opcode.
+_COMPILERS: Final[list[Callable[..., _OpFn]]] = [
+    _compile_tst,   # OP_TST
+    _compile_bf,    # OP_BF
+    _compile_bt,    # OP_BT
+    _compile_b,     # OP_B
+    _compile_cll,   # OP_CLL
+    _compile_r,     # OP_R
+    _compile_id,    # OP_ID
+    _compile_num,   # OP_NUM
+    _compile_sr,    # OP_SR
+    _compile_cl,    # OP_CL
+    _compile_ci,    # OP_CI
+    _compile_gn1,   # OP_GN1
+    _compile_gn2,   # OP_GN2
+    _compile_set,   # OP_SET
+    _compile_lb,    # OP_LB
+    _compile_out,   # OP_OUT
+    _compile_be,    # OP_BE
+]
 
 
 class MetaII:
     """The MetaII VM exceutor."""
 
-    def __init__(self):
-        self.meta_vm = VM(0, [])
-        self.opcodes = metaops
+    def __init__(self) -> None:
+        self.meta_vm = VM(0)
+        self.opcodes: dict[str, int] = metaops
         self.start = 0
+        self.undefined: dict[int, str] = {}
+        self.code: Union[list[Callable[[], int]], None] = None
 
     def assemble(self, assembly: str) -> None:
-        """Assemble the given source code, storing it in the VM."""
-        labels = {}  # type:dict[str, int]
-        memory = []
-        start = 0
+        """Assemble the given source code, storing it in the VM.
+
+        Memory is laid out structure-of-arrays style: a compact byte
+        array of opcode IDs beside a plain list holding each
+        instruction's single argument (or None), so the dispatch loop
+        never unpacks per-instruction tuples.
+        """
+        labels: dict[str, int] = {}
+        op_ids = array('b')
+        op_args: list[Union[str, int, None]] = []
+        start: Union[str, int] = 0
         for line in assembly.splitlines():
-            if all(map(lambda c: c in whitespace, line)):
+            stripped = line.strip()
+            if not stripped:
                 continue
             if line[0] not in whitespace:
-                labels[line.lstrip().rstrip()] = len(memory)
+                labels[intern(stripped)] = len(op_ids)
                 continue
-            split = map(lambda s: s.lstrip().rstrip(), line.split(maxsplit=1))
+            split = map(str.strip, line.split(maxsplit=1))
             opcode = next(split)
-            args = []
+            args: list[Union[str, int]] = []
             for arg in split:
-                match = re.match(r"'([^']+)'", arg)
-                if match:
-                    args.append(match[1])
-                    continue
-                match = re.match(r'[0-9]+', arg)
-                if match:
+                if arg.isdigit():
                     args.append(int(arg))
                     continue
-                args.append(arg)
+                if arg[:1] == "'":
+                    quote = arg.find("'", 1)
+                    if quote > 1:
+                        args.append(intern(arg[1:quote]))
+                        continue
+                args.append(intern(arg))
             if opcode in self.opcodes:
-                memory.append((self.opcodes[opcode], tuple(args)))
+                op_ids.append(self.opcodes[opcode])
+                op_args.append(args[0] if args else None)
             elif opcode == 'adr':
                 start = args[0]
             elif opcode == 'end':
                 break
             else:
                 raise ValueError(f"bad opcode {opcode} in line {repr(line)}")
-        self.meta_vm.memory = memory
+        # Branch and call targets are fully known now, so resolve label
+        # names to addresses once here rather than per branch taken.
+        # Undefined labels get a trap address past the end of memory;
+        # jumping to one raises just as lazy resolution used to, while a
+        # never-taken branch to one stays harmless.
+        undefined: dict[str, int] = {}
+        for i, op_id in enumerate(op_ids):
+            name = op_args[i]
+            if op_id in (OP_B, OP_BT, OP_BF, OP_CLL) \
+                    and isinstance(name, str):
+                if name in labels:
+                    op_args[i] = labels[name]
+                else:
+                    op_args[i] = undefined.setdefault(
+                        name, len(op_ids) + 1 + len(undefined))
+        self.undefined = {addr: name for name, addr in undefined.items()}
+        self.meta_vm.op_ids = op_ids
+        self.meta_vm.op_args = op_args
         self.meta_vm.labels = labels
-        self.start = self.meta_vm.resolve(start)
-
-    def step(self) -> None:
-        """Run a single step of the VM."""
-        opcode, args = self.meta_vm.memory[self.meta_vm.program_counter]
-        self.meta_vm.program_counter += 1
-        opcode(self.meta_vm, args)
+        self.start = labels[start] if isinstance(start, str) else start
+        self.code = None
+
+    def compile_program(self) -> list[Callable[[], int]]:
+        """Compile the assembled program into per-instruction closures,
+        returning (and caching) the closure list.
+
+        Each memory cell becomes a zero-argument closure with its
+        argument, operand length, and successor address bound in as
+        defaults, returning the next program counter. This partially
+        evaluates the interpreter over the program: running costs one
+        list index and one call per instruction, with no opcode
+        dispatch, argument fetch, or constant lookup left at runtime.
+        The factories live in _COMPILERS, indexed by opcode ID.
+        """
+        vm = self.meta_vm
+        op_ids = vm.op_ids
+        op_args = vm.op_args
+        total = len(op_ids)
+        compilers = _COMPILERS
+        code: list[Callable[[], int]] = []
+        for pc, (op, arg) in enumerate(zip(op_ids, op_args)):
+            nxt = pc + 1
+            # Fuse a parse opcode with a directly following conditional
+            # branch into one super-instruction: the pair dominates
+            # META-II programs, and fusing saves a dispatch cycle per
+            # pair. The branch keeps its own slot compiled, so jumps
+            # into it stay valid and no addresses move.
+            on_hit = on_miss = None
+            if op in (OP_TST, OP_ID, OP_NUM, OP_SR) and nxt < total \
+                    and op_ids[nxt] in (OP_BF, OP_BT):
+                target = op_args[nxt]
+                on_hit = target if op_ids[nxt] == OP_BT else nxt + 1
+                on_miss = target if op_ids[nxt] == OP_BF else nxt + 1
+            code.append(compilers[op](vm, arg, nxt, on_hit, on_miss))
+        self.code = code
+        return code
 
     def run(self, source: str) -> Union[str, None]:
         """Run the source code."""
-        self.meta_vm.reset()
-        self.meta_vm.inbuf = source
-        self.meta_vm.program_counter = self.start
-        self.meta_vm.stack += [len(self.meta_vm.memory), 0, 0]
-        while self.meta_vm.program_counter < len(self.meta_vm.memory):
-            try:
-                self.step()
-            except MetaSyntax:
-                print(f"SYNTAX ERROR IN LINE {self.meta_vm.linenum}")
-                return None
-        if self.meta_vm.switch:
-            return self.meta_vm.outbuf
-        print(f"SYNTAX ERROR IN LINE {self.meta_vm.linenum}")
+        vm = self.meta_vm
+        vm.reset()
+        vm.inbuf = source
+        code = self.code
+        if code is None:
+            code = self.compile_program()
+        end = len(code)
+        vm.stack.extend((end, 0, 0))
+        vm.flagstack.append(0)
+        pc = self.start
+        try:
+            while pc < end:
+                pc = code[pc]()
+        except MetaSyntax:
+            vm.program_counter = pc
+            print(f"SYNTAX ERROR IN LINE {vm.linenum}")
+            return None
+        vm.program_counter = pc
+        if pc in self.undefined:
+            raise KeyError(self.undefined[pc])
+        if vm.switch:
+            return vm.output
+        print(f"SYNTAX ERROR IN LINE {vm.linenum}")
         return None
 
 